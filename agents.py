@@ -16,8 +16,8 @@ from rag import WebKnowledgeEngine
 # 🤖 AGENTS
 # ==========================================
 
-def engineering_manager(user_request: str, llm: BaseChatModel, meter: TokenMeter, feedback: str = ""):
-    """Generates the initial High-Level Design (HLD)."""
+def manager_messages(user_request: str, feedback: str = "") -> list:
+    """Builds the Engineering Manager prompt for the initial HLD."""
     try:
         kb = WebKnowledgeEngine()
         context = kb.search(user_request)
@@ -34,7 +34,7 @@ def engineering_manager(user_request: str, llm: BaseChatModel, meter: TokenMeter
     3. For 'tech_stack', provide a LIST of objects with 'layer' and 'technology'.
     4. For 'storage_choices', provide a LIST of objects with 'component' and 'technology'.
     5. 'citations' are MANDATORY. Use your internal knowledge for citations if web data is low.
-    6. CRITICAL: Leave 'diagrams' as null. Do NOT generate URLs or placeholders. A separate specialist handles this.
+    6. CRITICAL: Leave 'diagrams' empty. Do NOT generate URLs or placeholders. A separate specialist handles this.
 
     RELEVANT CONTEXT:
     {context}
@@ -43,16 +43,20 @@ def engineering_manager(user_request: str, llm: BaseChatModel, meter: TokenMeter
     if feedback:
         system_msg += f"\n\n⚠️ CRITICAL FEEDBACK FROM PREVIOUS RUN: {feedback}\nYou MUST address these issues in this iteration."
 
+    return [("system", system_msg), ("human", user_request)]
+
+def engineering_manager(user_request: str, llm: BaseChatModel, meter: TokenMeter, feedback: str = ""):
+    """Generates the initial High-Level Design (HLD)."""
     structured_llm = llm.with_structured_output(HighLevelDesign)
     
     return structured_llm.invoke(
-        [("system", system_msg), ("human", user_request)],
+        manager_messages(user_request, feedback),
         config={"callbacks": [meter]}
     )
 
-def security_specialist(hld: HighLevelDesign, llm: BaseChatModel, meter: TokenMeter):
-    """Refines the Security Compliance section of the HLD."""
-    hld_context = hld.model_dump_json(indent=2)
+def security_messages(hld: HighLevelDesign) -> list:
+    """Builds the Security Specialist prompt."""
+    hld_context = hld.model_dump_json(exclude_none=True)
     system_msg = f"""
     You are a Security Specialist. Review and harden the 'security_compliance' section.
     Enforce GDPR, SOC2, and Zero Trust principles.
@@ -63,16 +67,19 @@ def security_specialist(hld: HighLevelDesign, llm: BaseChatModel, meter: TokenMe
     CURRENT HLD FOR REVIEW:
     {hld_context}
     """
-    
+    return [("system", system_msg), ("human", "Harden security strategy.")]
+
+def security_specialist(hld: HighLevelDesign, llm: BaseChatModel, meter: TokenMeter):
+    """Refines the Security Compliance section of the HLD."""
     structured_llm = llm.with_structured_output(SecurityCompliance)
     return structured_llm.invoke(
-        [("system", system_msg), ("human", "Harden security strategy.")],
+        security_messages(hld),
         config={"callbacks": [meter]}
     )
 
-def team_lead(hld: HighLevelDesign, llm: BaseChatModel, meter: TokenMeter):
-    """Generates the Low-Level Design (LLD)."""
-    hld_context = hld.model_dump_json(indent=2)
+def lead_messages(hld: HighLevelDesign) -> list:
+    """Builds the Team Lead prompt for the LLD."""
+    hld_context = hld.model_dump_json(exclude_none=True)
     system_msg = f"""
     You are a Senior Team Lead. Generate the Low Level Design (LLD) based on the HLD.
     
@@ -84,16 +91,20 @@ def team_lead(hld: HighLevelDesign, llm: BaseChatModel, meter: TokenMeter):
     HLD ARCHITECTURE TO IMPLEMENT: 
     {hld_context}
     """
+    return [("system", system_msg), ("human", "Generate detailed LLD.")]
+
+def team_lead(hld: HighLevelDesign, llm: BaseChatModel, meter: TokenMeter):
+    """Generates the Low-Level Design (LLD)."""
     structured_llm = llm.with_structured_output(LowLevelDesign)
     
     return structured_llm.invoke(
-        [("system", system_msg), ("human", "Generate detailed LLD.")],
+        lead_messages(hld),
         config={"callbacks": [meter]}
     )
 
 
-def architecture_judge(hld: HighLevelDesign, lld: LowLevelDesign, llm: BaseChatModel, meter: TokenMeter):
-    """Evaluates consistency between HLD and LLD."""
+def judge_messages(hld: HighLevelDesign, lld: LowLevelDesign) -> list:
+    """Builds the Judge prompt comparing HLD and LLD."""
     system_msg = """
     You are a QA Architect. Evaluate the HLD and LLD for consistency and gaps.
     
@@ -105,16 +116,20 @@ def architecture_judge(hld: HighLevelDesign, lld: LowLevelDesign, llm: BaseChatM
     - Are LLD components tracking HLD core components?
     - Is the technology stack consistent?
     """
+    user_content = f"HLD:\n{hld.model_dump_json(exclude_none=True)}\n\nLLD:\n{lld.model_dump_json(exclude_none=True)}"
+    return [("system", system_msg), ("human", user_content)]
+
+def architecture_judge(hld: HighLevelDesign, lld: LowLevelDesign, llm: BaseChatModel, meter: TokenMeter):
+    """Evaluates consistency between HLD and LLD."""
     structured_llm = llm.with_structured_output(JudgeVerdict)
     
-    user_content = f"HLD:\n{hld.model_dump_json()}\n\nLLD:\n{lld.model_dump_json()}"
     return structured_llm.invoke(
-        [("system", system_msg), ("human", user_content)],
+        judge_messages(hld, lld),
         config={"callbacks": [meter]}
     )
 
-def reiteration_agent(judge: JudgeVerdict, hld: HighLevelDesign, lld: LowLevelDesign, llm: BaseChatModel, meter: TokenMeter):
-    """Refines the design based on the Judge's critique."""
+def reiteration_messages(judge: JudgeVerdict, hld: HighLevelDesign, lld: LowLevelDesign) -> list:
+    """Builds the Refiner prompt from the Judge's critique."""
     system_msg = f"""
     You are a Principal Software Architect.
     Review the Judge's critique and IMPROVE both the HLD and LLD.
@@ -122,22 +137,26 @@ def reiteration_agent(judge: JudgeVerdict, hld: HighLevelDesign, lld: LowLevelDe
     You must output a 'RefinedDesign' object containing the full updated HLD and LLD.
     Do not return partial updates; return the complete objects.
     
-    IMPORTANT: Keep 'diagrams' as null in the HLD. Do not attempt to generate diagrams here.
+    IMPORTANT: Keep 'diagrams' empty in the HLD. Do not attempt to generate diagrams here.
     
     CRITIQUE: {judge.critique}
     MISMATCHES: {judge.hld_lld_mismatch}
     SECURITY GAPS: {judge.security_gaps}
     """
+    return [("system", system_msg), ("human", "Refine the complete design iteratively.")]
+
+def reiteration_agent(judge: JudgeVerdict, hld: HighLevelDesign, lld: LowLevelDesign, llm: BaseChatModel, meter: TokenMeter):
+    """Refines the design based on the Judge's critique."""
     structured_llm = llm.with_structured_output(RefinedDesign)
     
     return structured_llm.invoke(
-        [("system", system_msg), ("human", "Refine the complete design iteratively.")],
+        reiteration_messages(judge, hld, lld),
         config={"callbacks": [meter]}
     )
 
 def visual_architect(hld: HighLevelDesign, llm: BaseChatModel, meter: TokenMeter):
     """Generates Python code for Architecture Diagrams."""
-    hld_summary = hld.model_dump_json(include={'core_components', 'architecture_overview', 'data_architecture'})
+    hld_summary = hld.model_dump_json(exclude_none=True, include={'core_components', 'architecture_overview', 'data_architecture'})
     today = datetime.date.today().isoformat()
     system_msg = f"""
     You are a Visualization Expert.
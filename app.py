@@ -3,6 +3,7 @@ import pandas as pd
 import shutil
 import os
 import time
+import asyncio
 from datetime import datetime
 import agents
 import re
@@ -21,18 +22,6 @@ from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
 
 st.set_page_config(page_title="AI Architect Studio", layout="wide")
 
-class Component:
-    def __init__(self, name, class_structure_desc, module_boundaries, method_details, interface_specifications, dependency_direction, versioning, error_handling_local, security_considerations):
-        self.component_name = name
-        self.class_structure_desc = class_structure_desc
-        self.module_boundaries = module_boundaries
-        self.method_details = method_details
-        self.interface_specifications = interface_specifications
-        self.dependency_direction = dependency_direction
-        self.versioning = versioning
-        self.error_handling_local = error_handling_local
-        self.security_considerations = security_considerations
-
 # ==========================================
 #  SESSION STATE INITIALIZATION
 # ==========================================
@@ -1109,7 +1098,7 @@ def render_knowledge_page():
                 if uploaded_file := uploaded_kb:
                     if st.button("Ingest Uploaded File"):
                         with st.spinner("Indexing..."):
-                            res = kb.ingest_upload(uploaded_file)
+                            res = asyncio.run(kb.ingest_upload(uploaded_file))
                             st.success(res)
             
             # Option B: Bulk Ingest
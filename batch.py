@@ -0,0 +1,167 @@
+import io
+import json
+import time
+from datetime import date
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple, Type
+
+from openai import OpenAI
+from pydantic import BaseModel, TypeAdapter
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+import agents
+from model_factory import MODELS
+from schemas import HighLevelDesign, LowLevelDesign, JudgeVerdict, SecurityCompliance, RefinedDesign, ADAPTERS
+
+# ==========================================
+# 📦 OPENAI BATCH API
+# ==========================================
+
+ROLE_MAP = {"system": "system", "human": "user", "ai": "assistant"}
+TERMINAL_STATES = ("completed", "failed", "expired", "cancelled")
+
+@lru_cache(maxsize=None)
+def _tool_for(schema: Type[BaseModel]) -> Dict:
+    """Tool definition (JSON schema walk) built once per model; the judge/refiner loop reuses it."""
+    return convert_to_openai_tool(schema)
+
+class BatchProcessor:
+    """Submits one structured-output prompt per item through OpenAI's Batch API (50% cheaper, async)."""
+
+    def __init__(self, api_key: str, model: str, poll_interval: int = 30):
+        self.client = OpenAI(api_key=api_key)
+        self.model = model
+        self.poll_interval = poll_interval
+
+    def _request_line(self, custom_id: str, messages: list, tool: Dict) -> str:
+        body = {
+            "model": self.model,
+            "temperature": 0,
+            "messages": [{"role": ROLE_MAP[role], "content": content} for role, content in messages],
+            "tools": [tool],
+            "tool_choice": {"type": "function", "function": {"name": tool["function"]["name"]}},
+        }
+        return json.dumps({"custom_id": custom_id, "method": "POST", "url": "/v1/chat/completions", "body": body})
+
+    def run(self, schema: Type[BaseModel], conversations: List[list]) -> Tuple[List[Optional[BaseModel]], List[int]]:
+        """Returns one parsed object (or None on failure) and its token usage per conversation, in order."""
+        if not conversations:
+            return [], []
+
+        tool = _tool_for(schema)
+        adapter = ADAPTERS.get(schema) or TypeAdapter(schema)
+        payload = "\n".join(self._request_line(f"req-{i}", msgs, tool) for i, msgs in enumerate(conversations))
+        input_file = self.client.files.create(file=("batch.jsonl", io.BytesIO(payload.encode("utf-8"))), purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+        print(f"--- [BATCH] Submitted {batch.id}: {len(conversations)} x {schema.__name__} ---")
+
+        while batch.status not in TERMINAL_STATES:
+            time.sleep(self.poll_interval)
+            batch = self.client.batches.retrieve(batch.id)
+
+        if batch.status != "completed" or not batch.output_file_id:
+            raise RuntimeError(f"Batch {batch.id} ended with status '{batch.status}'")
+
+        results: List[Optional[BaseModel]] = [None] * len(conversations)
+        tokens = [0] * len(conversations)
+        for line in self.client.files.content(batch.output_file_id).text.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            idx = int(record["custom_id"].split("-", 1)[1])
+            try:
+                body = record["response"]["body"]
+                tokens[idx] = body.get("usage", {}).get("total_tokens", 0)
+                arguments = body["choices"][0]["message"]["tool_calls"][0]["function"]["arguments"]
+                results[idx] = adapter.validate_json(arguments)
+            except Exception as e:
+                print(f"Batch item {record['custom_id']} failed: {e}")
+        return results, tokens
+
+# ==========================================
+# 🏭 BATCH ARCHITECTURE RUN
+# ==========================================
+
+def _run_stage(processor: BatchProcessor, schema: Type[BaseModel], states: List[Dict], active: List[int], build_messages, role: str, message: str) -> List[Tuple[int, BaseModel]]:
+    """Runs one pipeline stage for every active state and returns the successful (index, result) pairs."""
+    results, tokens = processor.run(schema, [build_messages(states[i]) for i in active])
+    done = []
+    for i, result, used in zip(active, results, tokens):
+        states[i]["total_tokens"] += used
+        if result is None:
+            states[i]["logs"].append({"role": role, "message": "Batch request failed"})
+            continue
+        states[i]["logs"].append({"role": role, "message": message})
+        done.append((i, result))
+    return done
+
+def run_batch(user_requests: List[str], api_key: str, provider: str = "openai", max_retries: int = 2) -> List[Dict]:
+    """
+    Runs the architecture flow (manager -> security -> lead -> judge <-> refiner) for many
+    requests at once, one Batch API job per stage. Intended for offline/bulk regeneration.
+    """
+    if provider != "openai":
+        raise ValueError(f"Batch mode is not supported for provider: {provider}")
+
+    smart = BatchProcessor(api_key, MODELS[provider]["smart"])
+    fast = BatchProcessor(api_key, MODELS[provider]["fast"])
+    today = date.today().isoformat()
+
+    states = [{
+        "task": "architecture", "user_request": req, "provider": provider,
+        "hld": None, "lld": None, "verdict": None,
+        "retry_count": 0, "total_tokens": 0, "logs": [], "generated_date": today,
+    } for req in user_requests]
+
+    # 1. Manager
+    active = list(range(len(states)))
+    for i, hld in _run_stage(smart, HighLevelDesign, states, active,
+                             lambda s: agents.manager_messages(s["user_request"], feedback=f"Use tech stack current as of {today}"),
+                             "Manager", "HLD drafted"):
+        states[i]["hld"] = hld
+
+    # 2. Security
+    active = [i for i, s in enumerate(states) if s["hld"]]
+    secured = []
+    for i, security in _run_stage(smart, SecurityCompliance, states, active,
+                                  lambda s: agents.security_messages(s["hld"]),
+                                  "Security", "Security hardened"):
+        states[i]["hld"] = states[i]["hld"].model_copy(update={"security_compliance": security})
+        secured.append(i)
+
+    # 3. Team Lead (un-hardened HLDs stop here rather than flowing on into an LLD)
+    for i, lld in _run_stage(smart, LowLevelDesign, states, secured,
+                             lambda s: agents.lead_messages(s["hld"]),
+                             "Lead", "LLD created"):
+        states[i]["lld"] = lld
+
+    # 4. Judge <-> Refiner loop
+    active = [i for i, s in enumerate(states) if s["lld"]]
+    while active:
+        # A failed judge call must not leave last round's verdict behind to be refined again
+        for i in active:
+            states[i]["verdict"] = None
+        for i, verdict in _run_stage(fast, JudgeVerdict, states, active,
+                                     lambda s: agents.judge_messages(s["hld"], s["lld"]),
+                                     "Judge", "Verdict recorded"):
+            states[i]["verdict"] = verdict
+
+        active = [i for i in active
+                  if states[i]["verdict"] and not states[i]["verdict"].is_valid
+                  and states[i]["retry_count"] <= max_retries]
+        if not active:
+            break
+
+        for i, refined in _run_stage(smart, RefinedDesign, states, active,
+                                     lambda s: agents.reiteration_messages(s["verdict"], s["hld"], s["lld"]),
+                                     "Refiner", "Design refined"):
+            states[i]["hld"] = refined.hld
+            states[i]["lld"] = refined.lld
+        for i in active:
+            states[i]["retry_count"] += 1
+
+    return states
@@ -6,10 +6,9 @@ from schemas import (
     DiagramValidationResult, ArchitectureDiagrams, ProjectStructure
 )
 import agents
-import tools
 from model_factory import get_llm
 from callbacks import TokenMeter
-from tools import run_diagram
+from tools import run_diagrams, MERMAID_VALID
 import asyncio
 # ==========================================
 # Agent State
@@ -36,6 +35,26 @@ class AgentState(TypedDict):
 # 🧩 Nodes
 # ==========================================
 
+async def _validate_diagrams(codes: tuple) -> tuple:
+    # One browser launch for all three, checked concurrently: wall-clock is the slowest diagram
+    return tuple(await run_diagrams(codes))
+
+# Diagram sources that already passed. Failures are never remembered: a browser launch error,
+# CDN timeout or mmdc crash looks the same as a syntax error and must not stick for the process.
+_VALID_DIAGRAMS = set()
+MAX_VALID_DIAGRAMS = 768
+
+def _validate_diagrams_cached(system_context: str, container_diagram: str, data_flow: str) -> tuple:
+    """Mermaid check results per diagram; diagrams that already passed skip the headless browser entirely."""
+    codes = (system_context, container_diagram, data_flow)
+    pending = tuple(dict.fromkeys(code for code in codes if code not in _VALID_DIAGRAMS))
+    results = dict(zip(pending, asyncio.run(_validate_diagrams(pending)))) if pending else {}
+
+    if len(_VALID_DIAGRAMS) >= MAX_VALID_DIAGRAMS:
+        _VALID_DIAGRAMS.clear()
+    _VALID_DIAGRAMS.update(code for code, result in results.items() if result == MERMAID_VALID)
+    return tuple(results.get(code, MERMAID_VALID) for code in codes)
+
 def manager_node(state: AgentState):
     llm = get_llm(state['provider'], state['api_key'], "smart")
     meter = TokenMeter()
@@ -59,10 +78,8 @@ def security_node(state: AgentState):
     llm = get_llm(state['provider'], state['api_key'], "smart")
     meter = TokenMeter()
     improved_security = agents.security_specialist(state['hld'], llm, meter)
-    current_hld = state['hld'].model_copy()
-    current_hld.security_compliance = improved_security
     return {
-        "hld": current_hld,
+        "hld": state['hld'].model_copy(update={"security_compliance": improved_security}),
         "total_tokens": state.get("total_tokens", 0) + meter.total_tokens,
         "logs": [{"role": "Security", "message": "Security hardened"}]
     }
@@ -112,7 +129,7 @@ def visuals_node(state: AgentState):
 
     # Collect all three fields and their respective error messages
     codes = {field: getattr(diagrams, field) for field in diagram_fields}
-    errors = {field: asyncio.run(run_diagram(codes[field])) for field in diagram_fields}
+    errors = dict(zip(diagram_fields, _validate_diagrams_cached(*(codes[field] for field in diagram_fields))))
 
     # If any error occurs, pass all three diagrams and errors to diagram_fixer
     fixed_diagrams = agents.diagram_fixer(
@@ -3,19 +3,19 @@ from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_anthropic import ChatAnthropic
 from langchain_ollama import ChatOllama
 
+MODELS = {
+    "openai": {"fast": "gpt-4o-mini", "smart": "gpt-4.1-mini"},
+    "gemini": {"smart": "gemini-2.5-flash", "fast": "gemini-2.5-flash-lite"},
+    "claude": {"smart": "claude-3-5-sonnet-20240620", "fast": "claude-3-haiku-20240307"},
+    # "ollama": {"smart": "qwen3:8b", "fast": "phi4-mini:latest"}
+}
+
 def get_llm(provider: str, api_key: str, model_type: str = "smart"):
     """
     Initializes LLM with a session-specific API Key.
     """
     
-    models = {
-        "openai": {"fast": "gpt-4o-mini", "smart": "gpt-4.1-mini"},
-        "gemini": {"smart": "gemini-2.5-flash", "fast": "gemini-2.5-flash-lite"},
-        "claude": {"smart": "claude-3-5-sonnet-20240620", "fast": "claude-3-haiku-20240307"},
-        # "ollama": {"smart": "qwen3:8b", "fast": "phi4-mini:latest"}
-    }
-
-    selected_model = models[provider][model_type]
+    selected_model = MODELS[provider][model_type]
     temperature = 0
 
     if provider == "openai":
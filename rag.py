@@ -1,24 +1,6 @@
 import os
-import openai
 import asyncio
 import aiofiles
-import numpy as np
-import fitz  # PyMuPDF for PDF loading
-from typing import List, Optional
-from tqdm import tqdm  # For progress bar during batching
-from langchain_chroma import Chroma
-from langchain_openai import OpenAIEmbeddings
-from langchain_community.document_loaders import DirectoryLoader, TextLoader, UnstructuredPDFLoader
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_community.tools import DuckDuckGoSearchRun
-from langchain_community.utilities import DuckDuckGoSearchAPIWrapper
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from langchain_core.documents import Document
-from tqdm import tqdm
-
-
-import os
-import fitz  # PyMuPDF
 from typing import List, Optional
 from tqdm import tqdm
 from concurrent.futures import ThreadPoolExecutor, as_completed
@@ -26,8 +8,10 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 # LangChain Imports
 from langchain_chroma import Chroma
 from langchain_openai import OpenAIEmbeddings
-from langchain_community.document_loaders import PyMuPDFLoader, TextLoader
+from langchain_community.document_loaders import PyMuPDFLoader, TextLoader, UnstructuredPDFLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
+from langchain_community.tools import DuckDuckGoSearchRun
+from langchain_community.utilities import DuckDuckGoSearchAPIWrapper
 from langchain_core.documents import Document
 
 class KnowledgeEngine:
@@ -45,10 +29,17 @@ class KnowledgeEngine:
         )
         
         # 2. Connect to ChromaDB
+        # HNSW settings only apply when the collection is first created;
+        # delete ./chroma_db and re-ingest to rebuild an existing index with them.
         self.vector_store = Chroma(
             collection_name="arch_patterns",
             embedding_function=self.embedding_func,
-            persist_directory=db_dir
+            persist_directory=db_dir,
+            collection_metadata={
+                "hnsw:M": 32,
+                "hnsw:construction_ef": 200,
+                "hnsw:search_ef": 64,
+            }
         )
         
         os.makedirs(self.kb_dir, exist_ok=True)
@@ -59,8 +50,16 @@ class KnowledgeEngine:
         """Helper to load a single file based on extension."""
         try:
             if file_path.lower().endswith(".pdf"):
-                loader = PyMuPDFLoader(file_path)
-                return loader.load()
+                try:
+                    docs = PyMuPDFLoader(file_path).load()
+                    # Image-only (scanned) PDFs load fine but with no text layer
+                    if any(doc.page_content.strip() for doc in docs):
+                        return docs
+                    print(f"PyMuPDF found no text in {file_path}, falling back to Unstructured.")
+                except Exception as e:
+                    print(f"PyMuPDF failed on {file_path} ({e}), falling back to Unstructured.")
+                # Scanned/odd PDFs: fall back to the much slower OCR-capable loader
+                return UnstructuredPDFLoader(file_path).load()
             elif file_path.lower().endswith(".txt"):
                 loader = TextLoader(file_path, encoding='utf-8')
                 return loader.load()
@@ -96,7 +95,27 @@ class KnowledgeEngine:
         print(f"  > Total documents loaded: {len(docs)}")
         return self._add_docs_to_db(docs)
 
-    def _add_docs_to_db(self, docs: List[Document], cleanup_path: Optional[str] = None) -> str:
+    async def ingest_upload(self, uploaded_file) -> str:
+        """Saves an uploaded file without blocking the event loop, then indexes it."""
+        file_path = os.path.join(self.upload_dir, os.path.basename(uploaded_file.name))
+        print(f"--- [UPLOAD INGEST] Writing {file_path} ---")
+
+        try:
+            async with aiofiles.open(file_path, "wb") as f:
+                await f.write(uploaded_file.getbuffer())
+
+            # Loading and embedding are blocking; keep them off the event loop too
+            docs = await asyncio.to_thread(self._load_single_file, file_path)
+            if not docs:
+                return "No content to index."
+            return await asyncio.to_thread(self._add_docs_to_db, docs)
+        finally:
+            # The upload is only a staging copy; never leave it behind, whatever happened above
+            if os.path.exists(file_path):
+                os.remove(file_path)
+                print("  > Cleaned up temp file.")
+
+    def _add_docs_to_db(self, docs: List[Document]) -> str:
         """
         Splits and adds documents to the vector store concurrently.
         """
@@ -134,11 +153,7 @@ class KnowledgeEngine:
                     count = future.result()
                     total_indexed += count
                     pbar.update(count)
-        
-        if cleanup_path and os.path.exists(cleanup_path):
-            os.remove(cleanup_path)
-            print(f"  > Cleaned up temp file.")
-            
+
         return f"Success: Indexed {total_indexed} chunks."
 
     def search(self, query: str, k: int = 4, score_threshold: float = 0.5) -> Optional[str]:
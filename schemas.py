@@ -1,25 +1,39 @@
-from pydantic import BaseModel, Field, field_validator
-from typing import List, Optional
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
+from typing import List
+
+# Models are write-once after the LLM fills them in; core schemas build on first use
+FAST_CONFIG = ConfigDict(defer_build=True, frozen=True)
+
+# JudgeVerdict is the one model that stays mutable
+VERDICT_CONFIG = ConfigDict(FAST_CONFIG, frozen=False)
 
 # ==========================================
 # 📚 SHARED MODELS
 # ==========================================
 
 class Citation(BaseModel):
+    model_config = FAST_CONFIG
+
     description: str = Field(description="Context or claim being supported.")
     source: str = Field(description="Reference source (Book title, URL, Standard).")
 
 class TechStackItem(BaseModel):
+    model_config = FAST_CONFIG
+
     layer: str = Field(description="The architectural layer (e.g., 'Frontend').")
     technology: str = Field(description="The chosen technology (e.g., 'React').")
-    recommended_version: Optional[str] = None
-    rationale: Optional[str] = None
+    recommended_version: str = ""
+    rationale: str = ""
 
 class DataOwnerItem(BaseModel):
+    model_config = FAST_CONFIG
+
     component: str = Field(description="The service name.")
     data_owned: str = Field(description="Entities owned (e.g., 'User Profile').")
 
 class StorageChoiceItem(BaseModel):
+    model_config = FAST_CONFIG
+
     component: str = Field(description="The service name.")
     technology: str = Field(description="Storage technology (e.g., 'PostgreSQL').")
 
@@ -28,68 +42,64 @@ class StorageChoiceItem(BaseModel):
 # ==========================================
 
 class BusinessContext(BaseModel):
+    model_config = FAST_CONFIG
+
     version: str
-    change_log: List[str]
+    change_log: tuple[str, ...]
     problem_statement: str
-    business_goals: List[str]
-    in_scope: List[str]
-    out_of_scope: List[str]
-    assumptions_constraints: List[str]
-    non_goals: List[str]
-    stakeholders: List[str]
-
-    @field_validator('business_goals', 'stakeholders')
-    def list_must_not_be_empty(cls, v):
-        if not v:
-            raise ValueError('This list cannot be empty. Provide at least one item.')
-        return v
+    business_goals: tuple[str, ...] = Field(min_length=1)
+    in_scope: tuple[str, ...]
+    out_of_scope: tuple[str, ...]
+    assumptions_constraints: tuple[str, ...]
+    non_goals: tuple[str, ...]
+    stakeholders: tuple[str, ...] = Field(min_length=1)
 
 class ArchitectureDiagrams(BaseModel):
+    model_config = FAST_CONFIG
+
     # CHANGED: Updated descriptions to request Mermaid syntax
     system_context: str = Field(description="Mermaid.js code (graph TD or C4Context) for System Context.")
     container_diagram: str = Field(description="Mermaid.js code (graph TD with subgraphs) for Container Diagram.")
     data_flow: str = Field(description="Mermaid.js code (sequenceDiagram) for Data Flow.")
 
-    # @field_validator('system_context', 'container_diagram')
-    # def code_must_be_valid(cls, v):
-    #     if "Diagram" not in v:
-    #         raise ValueError("Code must use the 'diagrams' library.")
-    #     return v
-
 # HLD Additions
 class LayerTechRationale(BaseModel):
+    model_config = FAST_CONFIG
+
     layer: str = Field(description="Name of the architecture layer, e.g., 'Frontend', 'Backend'.")
     technology: str = Field(description="Technology used in this layer.")
     rationale: str = Field(description="Reason for choosing this technology over alternatives.")
     tradeoffs: str = Field(description="Key trade-offs considered for this layer's technology.")
 
 class EventFlowDescription(BaseModel):
+    model_config = FAST_CONFIG
+
     description: str = Field(description="Textual description of async/event-driven communication patterns.")
     components_involved: List[str] = Field(description="List of components involved in the flow.")
     event_types: List[str] = Field(description="Types of events/messages being exchanged.")
 
 class KPIMetric(BaseModel):
+    model_config = FAST_CONFIG
+
     goal: str = Field(description="Business goal or objective this KPI maps to.")
     metric: str = Field(description="Quantitative or qualitative metric for tracking success.")
-    target_value: Optional[str] = Field(description="Target value or threshold, if applicable.")
+    target_value: str = Field(default="", description="Target value or threshold, if applicable, else empty.")
 
 class ArchitectureOverview(BaseModel):
+    model_config = FAST_CONFIG
+
     style: str = Field(description="Architecture style (e.g., 'Microservices', 'Event-Driven', 'Monolith').")
-    external_interfaces: List[str]
-    user_stories: List[str]
-    tech_stack: List[TechStackItem]
-    diagrams: List[ArchitectureDiagrams]
+    external_interfaces: tuple[str, ...]
+    user_stories: tuple[str, ...]
+    tech_stack: List[TechStackItem] = Field(min_length=2, description="Technology per architectural layer; at least 2 layers.")
+    diagrams: List[ArchitectureDiagrams] = Field(default_factory=list, description="Leave empty; diagrams are generated separately.")
     layer_tech_rationale: List[LayerTechRationale] = Field(default_factory=list, description="Rationale for each layer's technology.")
     event_flows: List[EventFlowDescription] = Field(default_factory=list, description="Description of event-driven flows between components.")
     kpis: List[KPIMetric] = Field(default_factory=list, description="KPIs mapped to business goals.")
 
-    @field_validator('tech_stack')
-    def tech_stack_check(cls, v):
-        if len(v) < 2:
-            raise ValueError("Tech stack is too thin. Define at least 2 layers.")
-        return v
-
 class ComponentSpec(BaseModel):
+    model_config = FAST_CONFIG
+
     name: str
     responsibility: str
     design_patterns: List[str]
@@ -101,6 +111,8 @@ class ComponentSpec(BaseModel):
     component_ownership: str
 
 class DataArchitecture(BaseModel):
+    model_config = FAST_CONFIG
+
     data_ownership_map: List[DataOwnerItem]
     storage_choices: List[StorageChoiceItem]
     data_classification: str = Field(description="e.g., 'Public', 'Internal', 'Confidential', 'Restricted'")
@@ -110,6 +122,8 @@ class DataArchitecture(BaseModel):
     schema_evolution_strategy: str
 
 class IntegrationStrategy(BaseModel):
+    model_config = FAST_CONFIG
+
     public_apis: List[str]
     internal_apis: List[str]
     api_gateway_strategy: str
@@ -119,16 +133,20 @@ class IntegrationStrategy(BaseModel):
     backward_compatibility_plan: str
 
 class NFRs(BaseModel):
+    model_config = FAST_CONFIG
+
     scalability_plan: str
     availability_slo: str
     latency_targets: str
-    security_requirements: List[str]
+    security_requirements: tuple[str, ...]
     reliability_targets: str
     maintainability_plan: str
     cost_constraints: str
     load_testing_strategy: str
 
 class SecurityCompliance(BaseModel):
+    model_config = FAST_CONFIG
+
     threat_model_summary: str
     authentication_strategy: str
     authorization_strategy: str
@@ -136,9 +154,11 @@ class SecurityCompliance(BaseModel):
     data_encryption_at_rest: str
     data_encryption_in_transit: str
     auditing_mechanisms: str
-    compliance_certifications: List[str]
+    compliance_certifications: tuple[str, ...]
 
 class ReliabilityResilience(BaseModel):
+    model_config = FAST_CONFIG
+
     failover_strategy: str
     disaster_recovery_rpo_rto: str
     self_healing_mechanisms: str
@@ -146,12 +166,16 @@ class ReliabilityResilience(BaseModel):
     circuit_breaker_policy: str
 
 class ObservabilityStrategy(BaseModel):
+    model_config = FAST_CONFIG
+
     logging_strategy: str
-    metrics_collection: List[str]
+    metrics_collection: tuple[str, ...]
     tracing_strategy: str
-    alerting_rules: List[str]
+    alerting_rules: tuple[str, ...]
 
 class DeploymentOperations(BaseModel):
+    model_config = FAST_CONFIG
+
     cloud_provider: str
     deployment_model: str = Field(description="e.g., 'Serverless', 'Containers', 'VMs', 'On-Prem'")
     cicd_pipeline: str
@@ -162,12 +186,16 @@ class DeploymentOperations(BaseModel):
     git_repository_management: str
 
 class DesignDecisions(BaseModel):
-    patterns_used: List[str]
+    model_config = FAST_CONFIG
+
+    patterns_used: tuple[str, ...]
     tech_stack_justification: str
     trade_off_analysis: str
-    rejected_alternatives: List[str]
+    rejected_alternatives: tuple[str, ...]
 
 class HighLevelDesign(BaseModel):
+    model_config = FAST_CONFIG
+
     business_context: BusinessContext
     architecture_overview: ArchitectureOverview
     core_components: List[ComponentSpec]
@@ -186,6 +214,8 @@ class HighLevelDesign(BaseModel):
 # ==========================================
 
 class MethodDetail(BaseModel):
+    model_config = FAST_CONFIG
+
     method_name: str = Field(description="Name of the method/function.")
     purpose: str = Field(description="Short description of what this method does.")
     input_params: List[str] = Field(description="List of input parameters and types.")
@@ -193,32 +223,32 @@ class MethodDetail(BaseModel):
     algorithm_summary: str = Field(description="Brief description of the core logic/algorithm.")
 
 class DataAccessPattern(BaseModel):
+    model_config = FAST_CONFIG
+
     entity: str = Field(description="Entity or table being accessed.")
     pattern_description: str = Field(description="How data is typically accessed, queried, or updated.")
     example_queries: List[str] = Field(default_factory=list, description="Optional example queries illustrating usage.")
     lifecycle_notes: str = Field(description="Lifecycle considerations for this data (e.g., retention, archival).")
 
 class FailureHandlingFlow(BaseModel):
+    model_config = FAST_CONFIG
+
     component: str = Field(description="Component name.")
     flow_description: str = Field(description="Step-by-step failure handling flow.")
     retry_strategy: str = Field(description="Retry/backoff strategy for failures.")
     fallback_mechanisms: str = Field(description="Fallback or mitigation strategies when retries fail.")
 
 class LoadBenchmarkTarget(BaseModel):
+    model_config = FAST_CONFIG
+
     component: str = Field(description="Component/service name.")
     expected_load: str = Field(description="Expected concurrent requests, transactions per second, or data volume.")
     benchmark_metric: str = Field(description="Performance metric used for benchmarking (latency, throughput, etc.)")
     target_value: str = Field(description="Target performance value for this component under expected load.")
 
 class TestTraceability(BaseModel):
-    requirement: str = Field(description="Requirement or business goal being tested.")
-    test_description: List[str] = Field(description="Description of the test cases validating this requirement.")
-    coverage_status: str = Field(description="Coverage status (e.g., full, partial, missing).")
+    model_config = FAST_CONFIG
 
-from pydantic import BaseModel, Field
-from typing import List
-
-class TestTraceability(BaseModel):
     requirement: str = Field(description="Requirement or business goal being tested.")
     test_type: str = Field(description="Type of test (e.g., unit test, integration test, regression).")
     test_priority: str = Field(description="Priority of the test (e.g., low, medium, high).")
@@ -233,6 +263,8 @@ class TestTraceability(BaseModel):
 
 
 class InternalComponentDesign(BaseModel):
+    model_config = FAST_CONFIG
+
     component_name: str
     class_structure_desc: str
     module_boundaries: str
@@ -246,6 +278,8 @@ class InternalComponentDesign(BaseModel):
     load_benchmark_targets: List[LoadBenchmarkTarget] = Field(default_factory=list, description="Performance/load targets for this component.")
 
 class APIEndpointDetail(BaseModel):
+    model_config = FAST_CONFIG
+
     endpoint: str
     method: str
     request_schema: str
@@ -258,6 +292,8 @@ class APIEndpointDetail(BaseModel):
     versioning_strategy: str
 
 class DataModelDetail(BaseModel):
+    model_config = FAST_CONFIG
+
     entity: str
     attributes: List[str]
     indexes: List[str]
@@ -268,12 +304,16 @@ class DataModelDetail(BaseModel):
     access_patterns: List[DataAccessPattern] = Field(default_factory=list, description="Typical access patterns for this data.")
 
 class BusinessLogic(BaseModel):
+    model_config = FAST_CONFIG
+
     core_algorithms: str
     state_machine_desc: str
     concurrency_control: str
     async_processing_details: str
 
 class ErrorHandlingStrategy(BaseModel):
+    model_config = FAST_CONFIG
+
     error_taxonomy: str
     custom_error_codes: List[str]
     retry_policies: str
@@ -281,18 +321,24 @@ class ErrorHandlingStrategy(BaseModel):
     exception_handling_framework: str
 
 class SecurityImplementation(BaseModel):
+    model_config = FAST_CONFIG
+
     input_validation_rules: str
     auth_flow_diagram_desc: str
     token_management: str
     encryption_details: str
 
 class PerformanceEng(BaseModel):
+    model_config = FAST_CONFIG
+
     caching_strategy: str
     cache_invalidation: str
     async_processing_desc: str
     load_balancing_strategy: str
 
 class TestingStrategy(BaseModel):
+    model_config = FAST_CONFIG
+
     unit_test_scope: str
     integration_test_scope: str
     contract_testing_tools: str
@@ -300,12 +346,16 @@ class TestingStrategy(BaseModel):
     test_coverage_metrics: str
 
 class OperationalReadiness(BaseModel):
+    model_config = FAST_CONFIG
+
     runbook_summary: str
     incident_response_plan: str
     monitoring_and_alerts: List[str]
     backup_recovery_procedures: str
 
 class DocumentationGovernance(BaseModel):
+    model_config = FAST_CONFIG
+
     code_docs_standard: str
     api_docs_tooling: str
     adr_process: str
@@ -313,6 +363,8 @@ class DocumentationGovernance(BaseModel):
     internal_vs_public_docs: str
 
 class LowLevelDesign(BaseModel):
+    model_config = FAST_CONFIG
+
     detailed_components: List[InternalComponentDesign]
     api_design: List[APIEndpointDetail]
     data_model_deep_dive: List[DataModelDetail]
@@ -332,6 +384,8 @@ class LowLevelDesign(BaseModel):
 # ==========================================
 
 class JudgeVerdict(BaseModel):
+    model_config = VERDICT_CONFIG
+
     is_valid: bool
     critique: str
     score: int
@@ -343,11 +397,15 @@ class JudgeVerdict(BaseModel):
     iteration_recommendations: List[str]
 
 class RefinedDesign(BaseModel):
+    model_config = FAST_CONFIG
+
     hld: HighLevelDesign
     lld: LowLevelDesign
     improvement_notes: str
 
 class DiagramValidationResult(BaseModel):
+    model_config = FAST_CONFIG
+
     valid_syntax: bool
     missing_elements: List[str]
     invalid_elements: List[str]
@@ -358,17 +416,33 @@ class DiagramValidationResult(BaseModel):
 # ==========================================
 
 class FileSpec(BaseModel):
+    model_config = FAST_CONFIG
+
     filename: str = Field(description="Relative path, e.g., 'src/main.py'")
     content: str = Field(description="The actual code content.")
 
 class ProjectStructure(BaseModel):
+    model_config = FAST_CONFIG
+
     project_name: str
-    cookiecutter_url: Optional[str] = Field(description="URL to a cookiecutter template if applicable, else null.")
-    starter_files: List[FileSpec] = Field(description="List of essential starter files (README, requirements.txt, main entrypoint).")
-    
-    @field_validator('starter_files')
-    def has_files(cls, v):
-        if not v:
-            raise ValueError("Must generate at least one starter file (e.g., README).")
-        return v
-# ==========================================
\ No newline at end of file
+    cookiecutter_url: str = Field(default="", description="URL to a cookiecutter template if applicable, else empty.")
+    starter_files: List[FileSpec] = Field(min_length=1, description="List of essential starter files (README, requirements.txt, main entrypoint).")
+
+# ==========================================
+# ⚡ SECTION 5: CACHED ADAPTERS
+# ==========================================
+# Built once at import and shared by every caller that parses raw JSON.
+
+HLD_ADAPTER = TypeAdapter(HighLevelDesign)
+LLD_ADAPTER = TypeAdapter(LowLevelDesign)
+JUDGE_ADAPTER = TypeAdapter(JudgeVerdict)
+REFINED_ADAPTER = TypeAdapter(RefinedDesign)
+SECURITY_ADAPTER = TypeAdapter(SecurityCompliance)
+
+ADAPTERS = {
+    HighLevelDesign: HLD_ADAPTER,
+    LowLevelDesign: LLD_ADAPTER,
+    JudgeVerdict: JUDGE_ADAPTER,
+    RefinedDesign: REFINED_ADAPTER,
+    SecurityCompliance: SECURITY_ADAPTER,
+}
@@ -1,7 +1,18 @@
 import os
+import re
+import gzip
 import json
 import time
-from typing import List, Dict, Any, Optional
+import tempfile
+from functools import lru_cache, partial
+from typing import List, Dict, Any, Callable
+
+# orjson comes in with langsmith; stdlib json stays as the fallback
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
 
 # Include our schemas for reconstruction
 try:
@@ -19,22 +30,63 @@ except ImportError:
     DiagramValidationResult = None
 
 SNAPSHOT_DIR = "snapshots"
+# Anything other than letters, digits, space, '-' or '_' is dropped from snapshot filenames
+_UNSAFE_RE = re.compile(r"[^\w \-]+")
+
+# (snapshot key, model, label for error messages)
+_ARTIFACTS = (
+    ("hld", HighLevelDesign, "HLD"),
+    ("lld", LowLevelDesign, "LLD"),
+    ("verdict", JudgeVerdict, "Verdict"),
+    ("scaffold", ProjectStructure, "Scaffold"),
+    ("diagram_code", ArchitectureDiagrams, "Diagrams"),
+    ("diagram_validation", DiagramValidationResult, "Validation"),
+)
+
+# orjson >= 3.9 can embed already-serialized JSON, so models go straight from
+# pydantic-core to bytes with no intermediate dict
+_HAS_FRAGMENT = HAS_ORJSON and hasattr(orjson, "Fragment")
+
+# type -> converter, resolved once per type instead of probing attributes on every save
+_DUMP_CACHE: Dict[type, Callable[[Any], Any]] = {}
+
+def _identity(obj: Any) -> Any:
+    return obj
+
+def _model_fragment(obj: Any) -> Any:
+    return orjson.Fragment(obj.model_dump_json())
 
-def _to_dict(obj: Any) -> Dict:
-    """Convert Pydantic models to dicts for JSON saving."""
+def _to_jsonable(obj: Any) -> Any:
+    """Convert Pydantic models into something the JSON encoder can write directly."""
     if obj is None: return None
-    if hasattr(obj, "model_dump"): return obj.model_dump()
-    if hasattr(obj, "dict") and callable(obj.dict): return obj.dict()
-    return obj
+    t = type(obj)
+    fn = _DUMP_CACHE.get(t)
+    if fn is None:
+        if not hasattr(t, "model_dump"):
+            fn = _identity
+        elif _HAS_FRAGMENT:
+            fn = _model_fragment
+        else:
+            fn = partial(t.model_dump, mode="json")
+        _DUMP_CACHE[t] = fn
+    return fn(obj)
+
+# Filesystems limit names to 255 bytes (not characters); leave room for the extension
+MAX_NAME_BYTES = 255 - len(".json.gz")
+
+@lru_cache(maxsize=512)
+def _sanitize(project_name: str) -> str:
+    # Capped so a pasted paragraph (or a long non-ASCII title) can't produce a filename the OS rejects
+    name = _UNSAFE_RE.sub("", project_name).upper().strip()
+    name = name.encode("utf-8")[:MAX_NAME_BYTES].decode("utf-8", "ignore")
+    return name.rstrip() or "untitled_project"
 
 def get_file_path(project_name: str) -> str:
-    if not os.path.exists(SNAPSHOT_DIR):
-        os.makedirs(SNAPSHOT_DIR)
-    safe_name = "".join([c.capitalize() for c in project_name if c.isalnum() or c in (' ', '-', '_')]).strip() or "untitled_project"
-    return os.path.join(SNAPSHOT_DIR, f"{safe_name}.json")
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    return os.path.join(SNAPSHOT_DIR, f"{_sanitize(project_name)}.json.gz")
 
 def save_snapshot(project_name: str, state: Dict):
-    """Save the current state to a JSON file, excluding sensitive information (e.g., api_key)."""
+    """Save the current state to a gzipped JSON file, excluding sensitive information (e.g., api_key)."""
     filepath = get_file_path(project_name)
     
     # Extract 'provider' and exclude 'api_key' from the state
@@ -44,13 +96,13 @@ def save_snapshot(project_name: str, state: Dict):
     data_to_save = {
         "project_name": project_name,
         "user_request": state.get("user_request", ""),
-        "hld": _to_dict(state.get("hld")),
-        "lld": _to_dict(state.get("lld")),
-        "verdict": _to_dict(state.get("verdict")),
-        "scaffold": _to_dict(state.get("scaffold")),
-        "diagram_code": _to_dict(state.get("diagram_code")),
+        "hld": _to_jsonable(state.get("hld")),
+        "lld": _to_jsonable(state.get("lld")),
+        "verdict": _to_jsonable(state.get("verdict")),
+        "scaffold": _to_jsonable(state.get("scaffold")),
+        "diagram_code": _to_jsonable(state.get("diagram_code")),
         "diagram_path": state.get("diagram_path"),
-        "diagram_validation": _to_dict(state.get("diagram_validation")),
+        "diagram_validation": _to_jsonable(state.get("diagram_validation")),
         "metrics": state.get("metrics", {}),
         "total_tokens": state.get("total_tokens", 0),
         "logs": state.get("logs", []),
@@ -59,8 +111,27 @@ def save_snapshot(project_name: str, state: Dict):
     }
 
     try:
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(data_to_save, f, indent=2)
+        # No indent: gzip squeezes out the repetition, and level 1 keeps saves fast
+        if HAS_ORJSON:
+            payload = orjson.dumps(data_to_save, option=orjson.OPT_NON_STR_KEYS)
+        else:
+            payload = json.dumps(data_to_save).encode("utf-8")
+        payload = gzip.compress(payload, compresslevel=1)
+
+        # One write to a temp file next to the target, then an atomic swap:
+        # a crash mid-save never leaves a truncated snapshot behind
+        fd, tmp_path = tempfile.mkstemp(dir=SNAPSHOT_DIR, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(payload)
+            os.replace(tmp_path, filepath)
+        except Exception:
+            if os.path.exists(tmp_path): os.remove(tmp_path)
+            raise
+
+        # Drop the pre-gzip copy of this project so it isn't listed twice
+        legacy_path = filepath[:-len(".gz")]
+        if os.path.exists(legacy_path): os.remove(legacy_path)
         return os.path.basename(filepath)
     except Exception as e:
         print(f"Error saving snapshot: {e}")
@@ -71,9 +142,11 @@ def list_snapshots() -> List[str]:
     if not os.path.exists(SNAPSHOT_DIR): 
         return []
     try:
-        files = [f for f in os.listdir(SNAPSHOT_DIR) if f.endswith(".json")]
-        files.sort(key=lambda x: os.path.getmtime(os.path.join(SNAPSHOT_DIR, x)), reverse=True)
-        return files
+        # Names and mtimes in one directory pass; no separate getmtime per file
+        with os.scandir(SNAPSHOT_DIR) as it:
+            entries = [(e.name, e.stat().st_mtime) for e in it if e.name.endswith((".json", ".json.gz")) and e.is_file()]
+        entries.sort(key=lambda x: x[1], reverse=True)
+        return [name for name, _ in entries]
     except OSError: 
         return []
 
@@ -83,33 +156,19 @@ def load_snapshot(filename: str) -> Dict:
     if not os.path.exists(filepath): 
         raise FileNotFoundError(f"Snapshot {filename} not found.")
 
-    with open(filepath, "r", encoding="utf-8") as f: 
-        data = json.load(f)
+    with open(filepath, "rb") as f:
+        raw = f.read()
+    # Older snapshots are plain .json; newer ones are gzipped
+    if filename.endswith(".gz"):
+        raw = gzip.decompress(raw)
+    data = orjson.loads(raw) if HAS_ORJSON else json.loads(raw)
 
     # Reconstruct Pydantic objects
-    if HighLevelDesign and data.get("hld"):
-        try: data["hld"] = HighLevelDesign(**data["hld"])
-        except Exception as e: print(f"Failed to reconstruct HLD: {e}")
-
-    if LowLevelDesign and data.get("lld"):
-        try: data["lld"] = LowLevelDesign(**data["lld"])
-        except Exception as e: print(f"Failed to reconstruct LLD: {e}")
-
-    if JudgeVerdict and data.get("verdict"):
-        try: data["verdict"] = JudgeVerdict(**data["verdict"])
-        except Exception as e: print(f"Failed to reconstruct Verdict: {e}")
-
-    if ProjectStructure and data.get("scaffold"):
-        try: data["scaffold"] = ProjectStructure(**data["scaffold"])
-        except Exception as e: print(f"Failed to reconstruct Scaffold: {e}")
-
-    if ArchitectureDiagrams and data.get("diagram_code"):
-        try: data["diagram_code"] = ArchitectureDiagrams(**data["diagram_code"])
-        except Exception as e: print(f"Failed to reconstruct Diagrams: {e}")
-
-    if DiagramValidationResult and data.get("diagram_validation"):
-        try: data["diagram_validation"] = DiagramValidationResult(**data["diagram_validation"])
-        except Exception as e: print(f"Failed to reconstruct Validation: {e}")
+    # Old or hand-edited snapshots may not match the current schemas, so validate them
+    for key, cls, label in _ARTIFACTS:
+        if cls and data.get(key):
+            try: data[key] = cls.model_validate(data[key])
+            except Exception as e: print(f"Failed to reconstruct {label}: {e}")
 
     return data
 
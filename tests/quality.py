@@ -1,22 +1,30 @@
-from deepeval.metrics import GEval, AnswerRelevancyMetric
-from deepeval.test_case import LLMTestCase, LLMTestCaseParams
+# deepeval is heavy to import; only pay for it when an evaluation actually runs
+_METRIC = None
 
-# Custom Security Metric using LLM-as-a-Judge
-security_metric = GEval(
-    name="Security Hardening",
-    criteria="""
-    The system design MUST:
-    1. Explicitly mention authentication (OAuth, JWT, etc).
-    2. Encrypt data at rest and in transit.
-    3. Follow least-privilege principles.
-    Fail if it allows public access to private data or mentions plaintext passwords.
-    """,
-    evaluation_params=[LLMTestCaseParams.ACTUAL_OUTPUT],
-    threshold=0.7
-)
+def _security_metric():
+    """Custom Security Metric using LLM-as-a-Judge, built once on first use."""
+    global _METRIC
+    if _METRIC is None:
+        from deepeval.metrics import GEval
+        from deepeval.test_case import LLMTestCaseParams
+        _METRIC = GEval(
+            name="Security Hardening",
+            criteria="""
+            The system design MUST:
+            1. Explicitly mention authentication (OAuth, JWT, etc).
+            2. Encrypt data at rest and in transit.
+            3. Follow least-privilege principles.
+            Fail if it allows public access to private data or mentions plaintext passwords.
+            """,
+            evaluation_params=[LLMTestCaseParams.ACTUAL_OUTPUT],
+            threshold=0.7
+        )
+    return _METRIC
 
 def evaluate_design(user_request, hld_json):
     """Runs DeepEval security metric."""
+    from deepeval.test_case import LLMTestCase
+    security_metric = _security_metric()
     test_case = LLMTestCase(
         input=user_request,
         actual_output=hld_json
@@ -36,6 +44,41 @@ def evaluate_design(user_request, hld_json):
         "is_safe": security_score > 0.7
     }
 
+def evaluate_designs(cases):
+    """
+    Runs the security metric over many (user_request, hld_json) pairs in one deepeval
+    run, which evaluates test cases concurrently instead of one LLM round-trip at a time.
+    Returns one evaluate_design-style dict per pair, in order.
+    """
+    from deepeval import evaluate
+    from deepeval.test_case import LLMTestCase
+    # Async runs collect results in completion order, so each case carries its index in its name
+    test_cases = [LLMTestCase(input=u, actual_output=h, name=f"case-{i}") for i, (u, h) in enumerate(cases)]
+    if not test_cases:
+        return []
+
+    failed = {
+        "security_score": 0.5,
+        "security_reason": "Evaluation failed due to LLM error.",
+        "is_safe": False
+    }
+    try:
+        results = evaluate(test_cases=test_cases, metrics=[_security_metric()]).test_results
+    except Exception as e:
+        print(f"Eval Error: {e}")
+        return [dict(failed) for _ in test_cases]
+
+    out = [dict(failed) for _ in test_cases]
+    for result in results:
+        data = result.metrics_data[0]
+        score = data.score if data.score is not None else 0.5
+        out[int(result.name.rsplit("-", 1)[1])] = {
+            "security_score": score,
+            "security_reason": data.reason,
+            "is_safe": score > 0.7
+        }
+    return out
+
 def red_team_probe(hld_json):
     """Simulates a Red Team scan for obvious vulnerabilities."""
     vulnerabilities = []
@@ -0,0 +1,122 @@
+import os
+import sys
+import json
+from types import SimpleNamespace
+
+import pytest
+from pydantic import BaseModel
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import batch
+
+class Item(BaseModel):
+    name: str
+
+class FakeClient:
+    """Stands in for OpenAI(): records the uploaded batch and replays canned output lines."""
+
+    def __init__(self, output_lines, status="completed"):
+        self.uploaded = None
+        self.files = SimpleNamespace(create=self._create_file, content=self._content)
+        self.batches = SimpleNamespace(
+            create=lambda **kw: SimpleNamespace(id="batch-1", status="in_progress", output_file_id=None),
+            retrieve=lambda batch_id: SimpleNamespace(id=batch_id, status=status, output_file_id="out-1"),
+        )
+        self._output = "\n".join(output_lines)
+
+    def _create_file(self, file, purpose):
+        self.uploaded = file[1].getvalue().decode("utf-8")
+        return SimpleNamespace(id="in-1")
+
+    def _content(self, file_id):
+        return SimpleNamespace(text=self._output)
+
+def _output_line(idx, arguments, tokens=10):
+    body = {
+        "usage": {"total_tokens": tokens},
+        "choices": [{"message": {"tool_calls": [{"function": {"arguments": arguments}}]}}],
+    }
+    return json.dumps({"custom_id": f"req-{idx}", "response": {"body": body}})
+
+def _processor(client):
+    processor = batch.BatchProcessor(api_key="test", model="test-model", poll_interval=0)
+    processor.client = client
+    return processor
+
+def test_run_maps_output_back_by_custom_id():
+    """Output lines arrive in any order; failures become None without shifting the others."""
+    client = FakeClient([
+        _output_line(2, json.dumps({"name": "third"}), tokens=3),
+        "",
+        json.dumps({"custom_id": "req-1", "response": {"body": {"error": "boom"}}}),
+        _output_line(0, json.dumps({"name": "first"}), tokens=1),
+    ])
+    conversations = [[("human", f"prompt {i}")] for i in range(3)]
+
+    results, tokens = _processor(client).run(Item, conversations)
+
+    assert [r.name if r else None for r in results] == ["first", None, "third"]
+    assert tokens == [1, 0, 3]
+    assert len(client.uploaded.splitlines()) == 3
+    assert json.loads(client.uploaded.splitlines()[0])["body"]["messages"] == [{"role": "user", "content": "prompt 0"}]
+
+def test_run_raises_when_batch_does_not_complete():
+    client = FakeClient([], status="failed")
+    with pytest.raises(RuntimeError):
+        _processor(client).run(Item, [[("human", "prompt")]])
+
+def test_run_with_no_conversations_skips_the_api():
+    assert _processor(FakeClient([])).run(Item, []) == ([], [])
+
+class FakeHLD(BaseModel):
+    name: str
+    security_compliance: object = None
+
+def test_run_batch_fans_results_back_to_each_request(monkeypatch):
+    """
+    'secure' passes first time, 'retry' is refined once and then its second judge call fails,
+    'insecure' fails the security stage and must never reach the lead.
+    """
+    calls = []
+    judge_rounds = {}
+
+    # Each message builder just tags the conversation with the request it belongs to
+    monkeypatch.setattr(batch.agents, "manager_messages", lambda req, feedback=None: req)
+    monkeypatch.setattr(batch.agents, "security_messages", lambda hld: hld.name)
+    monkeypatch.setattr(batch.agents, "lead_messages", lambda hld: hld.name)
+    monkeypatch.setattr(batch.agents, "judge_messages", lambda hld, lld: hld.name)
+    monkeypatch.setattr(batch.agents, "reiteration_messages", lambda verdict, hld, lld: hld.name)
+
+    def fake_run(self, schema, conversations):
+        calls.append((schema.__name__, list(conversations)))
+        results = []
+        for name in conversations:
+            if schema is batch.HighLevelDesign:
+                results.append(FakeHLD(name=name))
+            elif schema is batch.SecurityCompliance:
+                results.append(None if name == "insecure" else "hardened")
+            elif schema is batch.LowLevelDesign:
+                results.append(f"lld-{name}")
+            elif schema is batch.JudgeVerdict:
+                judge_rounds[name] = judge_rounds.get(name, 0) + 1
+                if name == "retry" and judge_rounds[name] == 2:
+                    results.append(None)
+                else:
+                    results.append(SimpleNamespace(is_valid=name == "secure"))
+            else:
+                results.append(SimpleNamespace(hld=FakeHLD(name=name, security_compliance="hardened"), lld=f"refined-{name}"))
+        return results, [5] * len(conversations)
+
+    monkeypatch.setattr(batch.BatchProcessor, "run", fake_run)
+
+    secure, retry, insecure = batch.run_batch(["secure", "retry", "insecure"], api_key="test")
+
+    assert secure["verdict"].is_valid and secure["retry_count"] == 0
+    assert insecure["lld"] is None and insecure["verdict"] is None
+    assert ("LowLevelDesign", ["secure", "retry"]) in calls
+
+    # The failed second judge call leaves no verdict, so the stale one isn't refined again
+    assert retry["verdict"] is None
+    assert retry["lld"] == "refined-retry"
+    assert [c for c in calls if c[0] == "RefinedDesign"] == [("RefinedDesign", ["retry"])]
+    assert retry["total_tokens"] == 5 * 6
@@ -1,5 +1,9 @@
 import pytest
 import os
+import re
+import json
+import hashlib
+from importlib.metadata import version
 from deepeval import assert_test
 from deepeval.test_case import LLMTestCase
 from deepeval.metrics import AnswerRelevancyMetric, GEval
@@ -11,6 +15,39 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+# Passing LLM-judge results are cached by content hash, so CI reruns on unchanged
+# inputs skip the judge call. Failures are never cached and always re-run.
+CACHE_DIR = ".deepeval_cache"
+# Bump when the key layout changes; the deepeval version is part of the key because judge prompts change between releases
+CACHE_VERSION = 2
+DEEPEVAL_VERSION = version("deepeval")
+
+def _cache_key(test_case, metrics) -> str:
+    case = [
+        test_case.input, test_case.actual_output, test_case.expected_output,
+        test_case.context, test_case.retrieval_context,
+    ]
+    judges = [{
+        "metric": type(m).__name__,
+        "name": getattr(m, "name", None),
+        "criteria": getattr(m, "criteria", None),
+        "evaluation_steps": getattr(m, "evaluation_steps", None),
+        "evaluation_params": [str(p) for p in getattr(m, "evaluation_params", None) or []],
+        "judge_model": getattr(m, "evaluation_model", None),
+        "threshold": m.threshold,
+    } for m in metrics]
+    payload = json.dumps([CACHE_VERSION, DEEPEVAL_VERSION, case, judges], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def cached_assert_test(test_case, metrics):
+    path = os.path.join(CACHE_DIR, f"{_cache_key(test_case, metrics)}.json")
+    if os.path.exists(path):
+        return
+    assert_test(test_case, metrics)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({type(m).__name__: m.score for m in metrics}, f)
+
 # Define a robust scenario
 SCENARIO = "Design a ride-sharing backend for 100k users. Must use SQL."
 
@@ -32,6 +69,11 @@ MOCK_LLD = """
 }
 """
 
+MOCK_HLD_OBJ = json.loads(MOCK_HLD)
+
+# Case-sensitive on purpose; this is the SQL-constraint check, not a keyword search
+_SQL_RE = re.compile(r"SQL|Postgres|MySQL")
+
 def test_answer_relevancy():
     """Checks if the HLD actually addresses the user's prompt."""
     relevancy_metric = AnswerRelevancyMetric(threshold=0.7)
@@ -44,7 +86,7 @@ def test_answer_relevancy():
         retrieval_context=[] 
     )
     
-    assert_test(test_case, [relevancy_metric])
+    cached_assert_test(test_case, [relevancy_metric])
 
 def test_consistency_hld_lld():
     """Checks if LLD implements HLD components using GEval."""
@@ -61,15 +103,12 @@ def test_consistency_hld_lld():
         actual_output=MOCK_LLD # Treat LLD as the 'implementation'
     )
     
-    assert_test(test_case, [consistency_metric])
+    cached_assert_test(test_case, [consistency_metric])
 
 def test_constraints_adherence():
     """Simple assertion test for constraints."""
-    import json
-    hld_json = json.loads(MOCK_HLD)
-    
-    tech_stack = [t['technology'] for t in hld_json['architecture_overview']['tech_stack']]
+    tech_stack = [t['technology'] for t in MOCK_HLD_OBJ['architecture_overview']['tech_stack']]
     
     # Check for SQL requirement
-    has_sql = any("SQL" in t or "Postgres" in t or "MySQL" in t for t in tech_stack)
+    has_sql = any(_SQL_RE.search(t) for t in tech_stack)
     assert has_sql, "HLD failed to include SQL database as requested."
\ No newline at end of file
@@ -0,0 +1,80 @@
+import os
+import sys
+import gzip
+import json
+from typing import Literal, Union, get_args, get_origin
+
+import pytest
+from pydantic import BaseModel
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import storage
+from schemas import HighLevelDesign, LowLevelDesign, JudgeVerdict, ProjectStructure
+
+def _sample(annotation, name="value"):
+    """Builds valid sample data for any schema model: two entries per list, a placeholder per leaf."""
+    origin = get_origin(annotation)
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return {field: _sample(info.annotation, field) for field, info in annotation.model_fields.items()}
+    if origin in (list, tuple):
+        return [_sample(get_args(annotation)[0], name) for _ in range(2)]
+    if origin is dict:
+        return {"k1": "v1", "k2": "v2"}
+    if origin is Union:
+        return _sample(next(a for a in get_args(annotation) if a is not type(None)), name)
+    if origin is Literal:
+        return get_args(annotation)[0]
+    if annotation is bool:
+        return True
+    if annotation in (int, float):
+        return 7
+    return f"{name} sample"
+
+@pytest.fixture
+def state():
+    return {
+        "user_request": "Design a ride-sharing backend",
+        "provider": "openai",
+        "api_key": "sk-secret",
+        "hld": HighLevelDesign.model_validate(_sample(HighLevelDesign)),
+        "lld": LowLevelDesign.model_validate(_sample(LowLevelDesign)),
+        "verdict": JudgeVerdict.model_validate(_sample(JudgeVerdict)),
+        "scaffold": ProjectStructure.model_validate(_sample(ProjectStructure)),
+        "total_tokens": 1234,
+        "logs": [{"role": "Manager", "message": "HLD drafted"}],
+    }
+
+@pytest.fixture(autouse=True)
+def snapshot_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "SNAPSHOT_DIR", str(tmp_path))
+    return tmp_path
+
+def _assert_rebuilt(loaded, state):
+    for key, cls in (("hld", HighLevelDesign), ("lld", LowLevelDesign), ("verdict", JudgeVerdict), ("scaffold", ProjectStructure)):
+        assert isinstance(loaded[key], cls)
+        assert loaded[key] == state[key]
+    assert loaded["user_request"] == state["user_request"]
+    assert loaded["total_tokens"] == state["total_tokens"]
+    assert loaded["logs"] == state["logs"]
+
+def test_gzip_snapshot_round_trip(state, snapshot_dir):
+    filename = storage.save_snapshot("Ride Share", state)
+
+    assert filename == "RIDE SHARE.json.gz"
+    assert storage.list_snapshots() == [filename]
+    with gzip.open(snapshot_dir / filename) as f:
+        assert "api_key" not in json.load(f)
+
+    _assert_rebuilt(storage.load_snapshot(filename), state)
+
+def test_legacy_json_snapshot_still_loads(state, snapshot_dir):
+    legacy = {key: value.model_dump(mode="json") if isinstance(value, BaseModel) else value
+              for key, value in state.items() if key != "api_key"}
+    (snapshot_dir / "RIDE SHARE.json").write_text(json.dumps(legacy, indent=4), encoding="utf-8")
+
+    assert storage.list_snapshots() == ["RIDE SHARE.json"]
+    _assert_rebuilt(storage.load_snapshot("RIDE SHARE.json"), state)
+
+    # Re-saving the project replaces the legacy copy instead of listing it twice
+    storage.save_snapshot("Ride Share", state)
+    assert storage.list_snapshots() == ["RIDE SHARE.json.gz"]
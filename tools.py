@@ -1,18 +1,12 @@
 
 import os
 import requests
-import io
-import contextlib
-import time
 import shutil
+import signal
 import tempfile
-import sys
 import asyncio
-from pyppeteer import launch
-import asyncio
-from playwright.async_api import async_playwright
-import pypdf
-from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import pymupdf
 
 try:
     from cookiecutter.main import cookiecutter
@@ -20,6 +14,8 @@ try:
 except ImportError:
     HAS_COOKIECUTTER = False
 
+# Characters that break (or get misparsed in) Mermaid node ids; labels keep the original text
+_MERMAID_SANITIZE = str.maketrans({" ": "_", "-": "_", ".": "_", "/": "_"})
 
 def hld_to_mermaid(hld) -> dict:
     """
@@ -29,40 +25,48 @@ def hld_to_mermaid(hld) -> dict:
     
     # 1. System Context (Simple)
     # Assumes a central system with external interfaces
-    system_context = "graph TD\n"
-    system_context += "    User((User))\n"
-    system_context += "    System[System Boundary]\n"
-    system_context += "    User -->|Uses| System\n"
+    system_context = [
+        "graph TD",
+        "    User((User))",
+        "    System[System Boundary]",
+        "    User -->|Uses| System",
+    ]
     
     if hld.architecture_overview.external_interfaces:
         for ext in hld.architecture_overview.external_interfaces:
             # Sanitize name
-            safe_ext = ext.replace(" ", "_").replace("-", "_")
-            system_context += f"    {safe_ext}[{ext}]\n"
-            system_context += f"    System -->|Integrates| {safe_ext}\n"
+            safe_ext = ext.translate(_MERMAID_SANITIZE)
+            system_context.append(f"    {safe_ext}[{ext}]")
+            system_context.append(f"    System -->|Integrates| {safe_ext}")
 
     # 2. Container Diagram (Components & Database)
-    container = "graph TD\n"
+    container = ["graph TD"]
+
+    # Component names recur across node lines, dependency edges and storage edges; sanitize each once
+    storage_choices = hld.data_architecture.storage_choices
+    names = {comp.name for comp in hld.core_components}
+    names.update(dep for comp in hld.core_components for dep in comp.component_dependencies)
+    names.update(store.component for store in storage_choices)
+    names.update(store.technology for store in storage_choices)
+    safe = {name: name.translate(_MERMAID_SANITIZE) for name in names}
     
     # Create nodes for Core Components
     for comp in hld.core_components:
-        safe_name = comp.name.replace(" ", "_")
-        container += f"    {safe_name}[{comp.name}]\n"
+        safe_name = safe[comp.name]
+        container.append(f"    {safe_name}[{comp.name}]")
         
         # Add dependencies
         for dep in comp.component_dependencies:
-            safe_dep = dep.replace(" ", "_")
-            container += f"    {safe_name} --> {safe_dep}\n"
+            container.append(f"    {safe_name} --> {safe[dep]}")
             
     # Add Storage
-    for store in hld.data_architecture.storage_choices:
-        safe_store = store.technology.replace(" ", "_")
-        safe_comp = store.component.replace(" ", "_")
-        container += f"    {safe_store}[({store.technology})]\n"
-        container += f"    {safe_comp} -->|Reads/Writes| {safe_store}\n"
+    for store in storage_choices:
+        safe_store = safe[store.technology]
+        container.append(f"    {safe_store}[({store.technology})]")
+        container.append(f"    {safe[store.component]} -->|Reads/Writes| {safe_store}")
 
     # 3. Data Flow (Sequence Diagram)
-    data_flow = "sequenceDiagram\n    autonumber\n"
+    data_flow = ["sequenceDiagram", "    autonumber"]
     
     # Naive generation based on event flows or user stories
     # (Since we don't have a strict sequence step list in HLD, we visualize the Event Flows)
@@ -71,22 +75,70 @@ def hld_to_mermaid(hld) -> dict:
         comps = flow.components_involved
         if len(comps) >= 2:
             for i in range(len(comps) - 1):
-                data_flow += f"    {comps[i]}->>{comps[i+1]}: {flow.description}\n"
+                data_flow.append(f"    {comps[i]}->>{comps[i+1]}: {flow.description}")
 
+    # Lines are collected in lists and joined once, so large HLDs don't pay for repeated string copies
     return {
-        "system_context": system_context,
-        "container_diagram": container,
-        "data_flow": data_flow
+        "system_context": "\n".join(system_context) + "\n",
+        "container_diagram": "\n".join(container) + "\n",
+        "data_flow": "\n".join(data_flow) + "\n"
     }
 
 
 
-async def run_diagram(mermaid_code):
+# mermaid-cli, if installed, parses and renders offline with the bundled Mermaid grammar
+MMDC_PATH = shutil.which("mmdc")
+MERMAID_VALID = "Mermaid code is valid!"
+# mmdc starts its own Chromium, so it gets more headroom than the 5 s page check below
+MMDC_TIMEOUT = 30
+
+async def _run_mmdc(mermaid_code):
+    """Checks Mermaid code with mermaid-cli; a non-zero exit means the diagram didn't parse."""
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            proc = await asyncio.create_subprocess_exec(
+                MMDC_PATH, "--input", "-", "--output", os.path.join(tmp_dir, "out.svg"), "--quiet",
+                stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+                start_new_session=True  # own process group, so a timeout can take Chromium down with it
+            )
+            try:
+                _, err = await asyncio.wait_for(proc.communicate(mermaid_code.encode("utf-8")), timeout=MMDC_TIMEOUT)
+            except asyncio.TimeoutError:
+                # A hung render must not block visuals_node forever
+                if hasattr(os, "killpg"):
+                    os.killpg(proc.pid, signal.SIGKILL)
+                else:
+                    proc.kill()
+                await proc.wait()
+                return f"Syntax error in Mermaid code: mmdc timed out after {MMDC_TIMEOUT}s"
+        if proc.returncode == 0:
+            return MERMAID_VALID
+        return f"Syntax error in Mermaid code: {err.decode('utf-8', errors='replace').strip()}"
+    except Exception as e:
+        return f"Syntax error in Mermaid code: {str(e)}"
+
+async def run_diagram(mermaid_code, browser=None):
     """This function checks Mermaid code syntax using a headless browser."""
+    if browser is None and MMDC_PATH:
+        return await _run_mmdc(mermaid_code)
+    # Imported here so loading tools/graph doesn't pull in Playwright unless diagrams are validated
+    from playwright.async_api import async_playwright
+    if browser is None:
+        try:
+            async with async_playwright() as p:
+                browser = await p.chromium.launch(headless=True)
+                try:
+                    return await run_diagram(mermaid_code, browser)
+                finally:
+                    await browser.close()
+        except Exception as e:
+            return f"Syntax error in Mermaid code: {str(e)}"
+
     try:
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            page = await browser.new_page()
+        # A fresh context per check keeps pages isolated while sharing the browser process
+        context = await browser.new_context()
+        try:
+            page = await context.new_page()
 
             await page.set_content(f'''
                 <html>
@@ -109,11 +161,27 @@ async def run_diagram(mermaid_code):
 
             # Wait for the diagram to load or timeout after 5 seconds
             await page.wait_for_selector('#graphDiv', timeout=5000)
-            await browser.close()
-            return "Mermaid code is valid!"
+            return MERMAID_VALID
+        finally:
+            await context.close()
     except Exception as e:
         return f"Syntax error in Mermaid code: {str(e)}"
 
+async def run_diagrams(mermaid_codes) -> list:
+    """Checks several Mermaid snippets concurrently against one shared Chromium launch."""
+    if MMDC_PATH:
+        return list(await asyncio.gather(*(_run_mmdc(code) for code in mermaid_codes)))
+    from playwright.async_api import async_playwright
+    try:
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=True)
+            try:
+                return list(await asyncio.gather(*(run_diagram(code, browser) for code in mermaid_codes)))
+            finally:
+                await browser.close()
+    except Exception as e:
+        return [f"Syntax error in Mermaid code: {str(e)}"] * len(mermaid_codes)
+
 
 def generate_scaffold(structure, output_dir) -> list[str]:
     logs = []
@@ -124,13 +192,22 @@ def generate_scaffold(structure, output_dir) -> list[str]:
         except Exception as e: logs.append(f"⚠️ Cookiecutter failed: {e}")
 
     base_path = os.path.join(output_dir, "generated_app") 
-    for file_spec in structure.starter_files:
+    created_dirs = set()  # many files share a folder; only hit the filesystem once per directory
+
+    def write_file(file_spec) -> str:
         try:
             full_path = os.path.join(base_path, file_spec.filename)
-            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            parent_dir = os.path.dirname(full_path)
+            if parent_dir not in created_dirs:
+                os.makedirs(parent_dir, exist_ok=True)
+                created_dirs.add(parent_dir)
             with open(full_path, "w", encoding="utf-8") as f: f.write(file_spec.content)
-            logs.append(f"📄 Created {file_spec.filename}")
-        except Exception as e: logs.append(f"❌ Failed to write {file_spec.filename}: {e}")
+            return f"📄 Created {file_spec.filename}"
+        except Exception as e: return f"❌ Failed to write {file_spec.filename}: {e}"
+
+    # Writes are I/O-bound, so overlap them; map() keeps the logs in starter_files order
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        logs.extend(executor.map(write_file, structure.starter_files))
             
     logs.append(f"✅ Scaffolding complete in {base_path}")
     return logs
@@ -140,35 +217,77 @@ def ensure_knowledge_base_folder():
     if not os.path.exists("knowledge_base"):
         os.makedirs("knowledge_base")
 
+def _remote_length(book_url):
+    """Content-Length from a HEAD request, or None if the server doesn't report a usable one."""
+    head = requests.head(book_url, allow_redirects=True, timeout=10)
+    # An encoded (e.g. gzip) length never matches the decoded file we save
+    if not head.ok or head.headers.get("Content-Encoding", "identity") != "identity":
+        return None
+    try:
+        return int(head.headers["Content-Length"])
+    except (KeyError, ValueError):
+        return None
+
 # Download book function
 def download_book(book_name, book_url, folder="knowledge_base"):
     """
     Download a book from a URL and save it to the knowledge base folder.
-    If the book already exists, it will be skipped.
+    An existing copy is kept if its size matches the server's; without a size to compare,
+    the server revalidates it against the saved ETag, and without either it is kept as is.
     """
     ensure_knowledge_base_folder()
 
-    # Path where the book will be saved
+    # Path where the book will be saved, plus a sidecar holding the ETag it was downloaded with
     book_filename = os.path.join(folder, f"{book_name}.pdf")
+    etag_filename = book_filename + ".etag"
 
-    # Check if the book already exists
+    # Check if the book already exists and is complete
+    headers = {}
     if os.path.exists(book_filename):
-        print(f"'{book_name}' already exists, skipping download.")
-        return
+        try:
+            expected = _remote_length(book_url)
+        except requests.RequestException:
+            # Offline: keep whatever is already on disk
+            print(f"'{book_name}' already exists and the server is unreachable, skipping download.")
+            return
+        if expected is not None:
+            if os.path.getsize(book_filename) == expected:
+                print(f"'{book_name}' already exists, skipping download.")
+                return
+            # Size mismatch means a truncated or stale copy: fall through to a full, unconditional GET
+        elif os.path.exists(etag_filename):
+            # No size to compare against, so let the server decide via the ETag
+            with open(etag_filename) as f:
+                headers["If-None-Match"] = f.read().strip()
+        else:
+            # Nothing to compare against at all (e.g. HEAD unsupported, no ETag): trust the existing copy
+            print(f"'{book_name}' already exists, skipping download.")
+            return
     
     try:
-        # Get the content of the book
-        response = requests.get(book_url)
+        # Stream the book to disk in 1 MB chunks instead of holding the whole PDF in memory
+        with requests.get(book_url, headers=headers, stream=True, timeout=60) as response:
+            if response.status_code == 304:
+                print(f"'{book_name}' is unchanged on the server, skipping download.")
+            # Check if request was successful (status code 200)
+            elif response.status_code == 200:
+                response.raw.decode_content = True
+                # Write to a temp name first so an interrupted download isn't mistaken for a finished book
+                partial_filename = book_filename + ".part"
+                with open(partial_filename, "wb") as file:
+                    shutil.copyfileobj(response.raw, file, length=1024 * 1024)
+                os.replace(partial_filename, book_filename)
 
-        # Check if request was successful (status code 200)
-        if response.status_code == 200:
-            # Save the book content to the knowledge base folder
-            with open(book_filename, "wb") as file:
-                file.write(response.content)  # Write binary content (PDF)
+                etag = response.headers.get("ETag")
+                if etag:
+                    with open(etag_filename, "w") as f:
+                        f.write(etag)
+                elif os.path.exists(etag_filename):
+                    os.remove(etag_filename)
 
-            print(f"'{book_name}' downloaded and saved to {book_filename}")
-        else:
-            print(f"Failed to download '{book_name}', Status code: {response.status_code}")
+                print(f"'{book_name}' downloaded and saved to {book_filename}")
+            else:
+                print(f"Failed to download '{book_name}', Status code: {response.status_code}")
 
     except Exception as e:
         print(f"Error downloading '{book_name}': {e}")
@@ -197,9 +316,13 @@ books_map = {
        }
 
 # Function to download multiple books
-def download_multiple_books(books_map = books_map, folder="knowledge_base"):
-    for book_name, book_url in books_map.items():
-        download_book(book_name, book_url, folder)
+def download_multiple_books(books_map = books_map, folder="knowledge_base", max_workers=8):
+    """Downloads all books concurrently; wall time is the slowest download instead of the sum."""
+    ensure_knowledge_base_folder()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(download_book, book_name, book_url, folder) for book_name, book_url in books_map.items()]
+        for future in as_completed(futures):
+            future.result()
 
 
 def extract_text_from_file(uploaded_file) -> str:
@@ -207,15 +330,15 @@ def extract_text_from_file(uploaded_file) -> str:
     try:
         # 1. Handle PDF
         if uploaded_file.type == "application/pdf":
-            reader = pypdf.PdfReader(BytesIO(uploaded_file.getvalue()))
-            text = []
-            for page in reader.pages:
-                text.append(page.extract_text())
-            return "\n".join(text)
+            # PyMuPDF (native MuPDF) is already a dependency for RAG ingestion and is far faster than pypdf
+            # MuPDF reads the upload's buffer directly (no getvalue() copy); the view is released on exit.
+            # Serial on purpose: forking a worker pool from the threaded Streamlit server costs more than it saves
+            with uploaded_file.getbuffer() as pdf_buffer, pymupdf.open(stream=pdf_buffer, filetype="pdf") as doc:
+                return "\n".join(page.get_text() for page in doc)
             
         # 2. Handle Text
         elif "text" in uploaded_file.type:
-            return str(uploaded_file.read(), "utf-8")
+            return uploaded_file.getvalue().decode("utf-8", errors="replace")
             
         else:
             return "Unsupported file format. Please upload PDF or TXT."